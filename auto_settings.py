@@ -19,7 +19,12 @@ class Settings:
             },
             "whisper": {
                 "model": "tiny",  # tiny, base, small, medium, large
-                "language": "en"
+                "language": "en",
+                "no_speech_threshold": 0.6,  # Stop decoding above this no-speech probability
+                "logprob_threshold": -1.0,  # Drop results with lower average log-probability
+                "compression_ratio_threshold": 2.4,  # Drop more repetitive results
+                "use_weight_cache": True,
+                "weight_cache_dir": None  # Defaults to ~/.cache/auto_start/weights
             },
             "ui": {
                 "theme": "system",
@@ -30,6 +35,26 @@ class Settings:
                 "rate": 150,
                 "volume": 1.0,
                 "voice": None  # Use system default
+            },
+            "scheduler": {
+                "enabled": True,
+                "target_p95_ms": 2000,  # Latency target for a transcription
+                "headroom": 0.5,  # Step up when p95 is below this fraction of the target
+                "window": 20,  # Number of recent transcriptions to measure
+                "evaluate_every": 5,
+                "min_model": "tiny",  # The whisper model setting is the largest used
+                "calibration_file": "scheduler_calibration.json",
+                "calibration_budget_s": 30  # Startup calibration stops after this long
+            },
+            "server": {
+                "host": "127.0.0.1",
+                "port": 8765,
+                "unix_socket": None,  # Path to listen on instead of TCP
+                "max_batch_size": 8,
+                "batch_window_ms": 50,
+                "energy_threshold": 0.01,
+                "silence_ms": 600,
+                "max_utterance_s": 15
             }
         }
         self._load_settings()
@@ -0,0 +1,206 @@
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import whisper
+from skills_manager import SkillsManager
+from command_processor import CommandProcessor
+from whisper_integration import WhisperTranscriber
+from auto_settings import Settings
+
+AUDIO_EXTENSIONS = {".wav", ".mp3", ".flac", ".ogg", ".m4a", ".webm"}
+
+def collect_clips(inputs):
+    """
+    Expand folders and manifest files into a list of audio paths
+
+    Folders are searched recursively for audio files. Manifests are either
+    plain text with one path per line or JSONL with a "path" key per line;
+    relative paths are resolved against the manifest's folder.
+    """
+    clips = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, files in os.walk(item):
+                for name in sorted(files):
+                    if os.path.splitext(name)[1].lower() in AUDIO_EXTENSIONS:
+                        clips.append(os.path.join(root, name))
+        elif os.path.splitext(item)[1].lower() in AUDIO_EXTENSIONS:
+            clips.append(item)
+        else:
+            clips.extend(_read_manifest(item))
+    return clips
+
+def _read_manifest(manifest_path):
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    clips = []
+    with open(manifest_path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            path = json.loads(line)["path"] if line.startswith("{") else line
+            clips.append(path if os.path.isabs(path) else os.path.join(base_dir, path))
+    return clips
+
+def load_checkpoint(output_path, model_name):
+    """
+    Return the set of clips already labelled by model_name in an existing output file
+
+    Records from other models do not count, so rerunning with a different model
+    re-labels every clip. Clips that failed are not counted as done and are
+    retried; the retry appends a new record, so readers should keep the last
+    record for each path and model.
+
+    Lines that cannot be parsed are skipped with a warning and left in the file.
+    Only an unterminated last line (from an interrupted run) is changed: it is
+    completed with a newline if it is a whole record, otherwise removed, so the
+    file can be appended to safely.
+    """
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+
+    offset = 0
+    unterminated = None
+    with open(output_path, 'rb') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.endswith(b"\n"):
+                unterminated = line
+                break
+            offset += len(line)
+            try:
+                record = json.loads(line)
+            except ValueError:
+                print(f"Skipping unreadable record on line {line_number} of {output_path}")
+                continue
+            if "error" not in record and record.get("model") == model_name:
+                done.add(record["path"])
+
+    if unterminated is not None:
+        try:
+            record = json.loads(unterminated)
+        except ValueError:
+            record = None
+
+        with open(output_path, 'r+b') as f:
+            if record is None:
+                print(f"Removing incomplete record at end of {output_path}")
+                f.truncate(offset)
+            else:
+                f.seek(0, os.SEEK_END)
+                f.write(b"\n")
+                if "error" not in record and record.get("model") == model_name:
+                    done.add(record["path"])
+    return done
+
+def _load_audio(path):
+    try:
+        return whisper.load_audio(path), None
+    except Exception as e:
+        return None, str(e)
+
+class BatchLabeler:
+    """Transcribes clips in batches and labels them with the matching skill"""
+
+    def __init__(self, transcriber, command_processor, batch_size=16, loader_threads=4):
+        self.transcriber = transcriber
+        self.command_processor = command_processor
+        self.batch_size = batch_size
+        self.loader = ThreadPoolExecutor(max_workers=loader_threads)
+
+    def _load_batch(self, paths):
+        return list(self.loader.map(_load_audio, paths))
+
+    def run(self, clips, output_path):
+        """Process clips and append one JSON record per clip to output_path"""
+        model_name = self.transcriber.loaded_model_name
+        batches = [clips[i:i + self.batch_size] for i in range(0, len(clips), self.batch_size)]
+        processed = 0
+        started = time.monotonic()
+
+        with open(output_path, 'a') as out, ThreadPoolExecutor(max_workers=1) as prefetch:
+            # Decode the current batch while the next one is read from disk
+            next_batch = prefetch.submit(self._load_batch, batches[0]) if batches else None
+            for index, paths in enumerate(batches):
+                loaded = next_batch.result()
+                if index + 1 < len(batches):
+                    next_batch = prefetch.submit(self._load_batch, batches[index + 1])
+
+                records = self._label_batch(paths, loaded)
+                for record in records:
+                    record["model"] = model_name
+                    out.write(json.dumps(record) + "\n")
+                out.flush()
+
+                processed += len(paths)
+                elapsed = time.monotonic() - started
+                rate = processed / elapsed if elapsed else 0.0
+                print(f"Processed {processed}/{len(clips)} clips ({rate:.1f} clips/s)")
+
+        return processed
+
+    def _label_batch(self, paths, loaded):
+        records = [{"path": path} for path in paths]
+        audios = []
+        decoded = []
+        for record, (audio, error) in zip(records, loaded):
+            if error:
+                record["error"] = error
+            else:
+                audios.append(audio)
+                decoded.append(record)
+
+        results = self.transcriber.transcribe_batch(audios) if audios else []
+        for record, audio, result in zip(decoded, audios, results):
+            record.update(result)
+            # transcribe_batch decodes a single 30 second window
+            if len(audio) > whisper.audio.N_SAMPLES:
+                record["truncated"] = True
+                print(f"Warning: {record['path']} is longer than {whisper.audio.CHUNK_LENGTH}s, "
+                      f"only the start was transcribed")
+            skill_name = None
+            record["accepted"] = self.transcriber.is_confident(result)
+            if record["accepted"]:
+                skill_name, _ = self.command_processor.process_command(result["text"])
+            record["skill"] = skill_name
+        return records
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Transcribe and label recorded commands offline")
+    parser.add_argument("inputs", nargs="+", help="Audio folders, audio files or manifest files")
+    parser.add_argument("-o", "--output", required=True, help="JSONL output file, also used as the checkpoint")
+    parser.add_argument("--batch-size", type=int, default=16, help="Clips per forward pass")
+    parser.add_argument("--model", help="Whisper model to use instead of the one in settings")
+    parser.add_argument("--restart", action="store_true", help="Ignore existing output and start over")
+    args = parser.parse_args(argv)
+
+    clips = collect_clips(args.inputs)
+    if args.restart and os.path.exists(args.output):
+        os.remove(args.output)
+
+    model_name = args.model or Settings().get("whisper", "model", "tiny")
+    done = load_checkpoint(args.output, model_name)
+    remaining = [clip for clip in clips if clip not in done]
+    print(f"Found {len(clips)} clips, {len(done)} already labelled with {model_name}, "
+          f"{len(remaining)} to process")
+    if not remaining:
+        return 0
+
+    transcriber = WhisperTranscriber(model_name=model_name)
+    if transcriber.loaded_model_name != model_name:
+        print(f"Could not load Whisper model {model_name}; not labelling with {transcriber.loaded_model_name}")
+        return 1
+    command_processor = CommandProcessor(SkillsManager())
+    labeler = BatchLabeler(transcriber, command_processor, batch_size=args.batch_size)
+
+    started = time.monotonic()
+    processed = labeler.run(remaining, args.output)
+    elapsed = time.monotonic() - started
+    print(f"Labelled {processed} clips in {elapsed:.1f}s ({processed / max(elapsed, 1e-9):.1f} clips/s)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -13,9 +13,12 @@ class CommandProcessor:
         tuple: (skill_name, skill_function) or (None, None) if no match
         """
         command_text = command_text.lower()
+        # Skills may be reloaded on another thread; the dict of a loaded catalog
+        # is never refilled, so keep using the one taken here
+        skills = self.skills_manager.get_all_skills()
         
         # First try direct skill name matching
-        for name, skill in self.skills_manager.get_all_skills().items():
+        for name, skill in skills.items():
             if name.lower() in command_text:
                 print(f"Direct match found for skill: {name}")
                 return name, skill.action
@@ -24,7 +27,7 @@ class CommandProcessor:
         best_match = None
         best_score = 0
         
-        for name, skill in self.skills_manager.get_all_skills().items():
+        for name, skill in skills.items():
             # Check for keyword matches
             for keyword in skill.keywords:
                 if keyword.lower() in command_text:
@@ -43,18 +46,15 @@ class CommandProcessor:
         best_match = None
         best_score = 0
         
-        for name, skill in self.skills_manager.get_all_skills().items():
-            # Create a set of words from skill name, description and keywords
-            skill_words = set(re.findall(r'\b\w+\b', f"{name} {skill.description}"))
-            skill_words.update(skill.keywords)
-            
-            # Calculate similarity score
-            common_words = command_words.intersection(skill_words)
-            if common_words:
-                score = len(common_words) / len(command_words)
-                if score > best_score:
-                    best_score = score
-                    best_match = (name, skill.action)
+        # The skills manager's match index gives the words each skill shares with
+        # the command (from its name, description and keywords) without scanning
+        # every skill
+        word_counts = self.skills_manager.count_word_matches(command_words)
+        for name in sorted(word_counts, key=self.skills_manager.registration_order):
+            score = word_counts[name] / len(command_words)
+            if score > best_score and name in skills:
+                best_score = score
+                best_match = (name, skills[name].action)
         
         if best_match and best_score > 0.3:  # Higher threshold for fuzzy matching
             print(f"Fuzzy match found for skill: {best_match[0]} (score: {best_score})")
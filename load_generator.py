@@ -0,0 +1,163 @@
+import sys
+import json
+import time
+import wave
+import asyncio
+import argparse
+import numpy as np
+from auto_settings import Settings
+
+SAMPLE_RATE = 16000
+CHUNK_MS = 100
+
+def load_wav(path):
+    """Load a WAV file as 16-bit mono PCM bytes at 16 kHz"""
+    with wave.open(path, 'rb') as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit PCM WAV files are supported")
+        channels = wav.getnchannels()
+        rate = wav.getframerate()
+        samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype="<i2")
+
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+
+    if rate != SAMPLE_RATE:
+        # Linear resampling is good enough for load testing
+        duration = len(samples) / rate
+        target = np.linspace(0, len(samples) - 1, int(duration * SAMPLE_RATE))
+        samples = np.interp(target, np.arange(len(samples)), samples)
+
+    return samples.astype("<i2").tobytes()
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    return float(np.percentile(values, pct))
+
+class LoadGenerator:
+    """Replays WAV clips against the recognition server as concurrent fake clients"""
+
+    def __init__(self, clips, clients=4, iterations=1, realtime=True,
+                 host="127.0.0.1", port=8765, unix_socket=None):
+        self.clips = clips
+        self.clients = clients
+        self.iterations = iterations
+        self.realtime = realtime
+        self.host = host
+        self.port = port
+        self.unix_socket = unix_socket
+        self.end_to_end_ms = []
+        self.server_latency_ms = []
+        self.batch_sizes = []
+        self.utterances = 0
+        self.clips_sent = 0
+        self.audio_seconds = 0.0
+        self.errors = 0
+
+    async def _connect(self):
+        if self.unix_socket:
+            return await asyncio.open_unix_connection(self.unix_socket)
+        return await asyncio.open_connection(self.host, self.port)
+
+    async def _replay(self, pcm):
+        """Stream one clip over a new connection and collect its results"""
+        reader, writer = await self._connect()
+        chunk_bytes = SAMPLE_RATE * 2 * CHUNK_MS // 1000
+
+        for start in range(0, len(pcm), chunk_bytes):
+            writer.write(pcm[start:start + chunk_bytes])
+            await writer.drain()
+            if self.realtime:
+                await asyncio.sleep(CHUNK_MS / 1000)
+        writer.write_eof()
+        sent_at = time.monotonic()
+
+        responses = []
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            responses.append(json.loads(line))
+        received_at = time.monotonic()
+        writer.close()
+
+        self.clips_sent += 1
+        self.audio_seconds += len(pcm) / (SAMPLE_RATE * 2)
+        if responses:
+            self.end_to_end_ms.append((received_at - sent_at) * 1000)
+        for response in responses:
+            self.utterances += 1
+            if "error" in response:
+                self.errors += 1
+            if "latency_ms" in response:
+                self.server_latency_ms.append(response["latency_ms"])
+            if "batch_size" in response:
+                self.batch_sizes.append(response["batch_size"])
+
+    async def _client(self, client_id):
+        for _ in range(self.iterations):
+            # Offset the starting clip so clients do not all send the same audio
+            for i in range(len(self.clips)):
+                pcm = self.clips[(client_id + i) % len(self.clips)]
+                try:
+                    await self._replay(pcm)
+                except (OSError, ValueError) as e:
+                    print(f"Client {client_id} error: {e}")
+                    self.errors += 1
+
+    async def run(self):
+        """Run all clients to completion and return a summary dict"""
+        started = time.monotonic()
+        await asyncio.gather(*(self._client(i) for i in range(self.clients)))
+        elapsed = time.monotonic() - started
+
+        return {
+            "clients": self.clients,
+            "clips": self.clips_sent,
+            "utterances": self.utterances,
+            "errors": self.errors,
+            "elapsed_s": round(elapsed, 2),
+            "utterances_per_s": round(self.utterances / elapsed, 2) if elapsed else 0.0,
+            "audio_s_per_s": round(self.audio_seconds / elapsed, 2) if elapsed else 0.0,
+            "mean_batch_size": round(float(np.mean(self.batch_sizes)), 2) if self.batch_sizes else 0.0,
+            "server_latency_ms": {
+                "p50": round(percentile(self.server_latency_ms, 50), 1),
+                "p95": round(percentile(self.server_latency_ms, 95), 1),
+                "p99": round(percentile(self.server_latency_ms, 99), 1)
+            },
+            "end_to_end_ms": {
+                "p50": round(percentile(self.end_to_end_ms, 50), 1),
+                "p95": round(percentile(self.end_to_end_ms, 95), 1),
+                "p99": round(percentile(self.end_to_end_ms, 99), 1)
+            }
+        }
+
+def main(argv=None):
+    settings = Settings()
+    parser = argparse.ArgumentParser(description="Replay WAV files against the recognition server")
+    parser.add_argument("wav_files", nargs="+", help="16-bit PCM WAV clips to replay")
+    parser.add_argument("--clients", type=int, default=4, help="Number of concurrent fake clients")
+    parser.add_argument("--iterations", type=int, default=1, help="Times each client replays the clip set")
+    parser.add_argument("--no-realtime", action="store_true",
+                        help="Send audio as fast as possible instead of at real-time pace")
+    parser.add_argument("--host", default=settings.get("server", "host", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=settings.get("server", "port", 8765))
+    parser.add_argument("--unix-socket", default=settings.get("server", "unix_socket"))
+    args = parser.parse_args(argv)
+
+    clips = [load_wav(path) for path in args.wav_files]
+    generator = LoadGenerator(
+        clips,
+        clients=args.clients,
+        iterations=args.iterations,
+        realtime=not args.no_realtime,
+        host=args.host,
+        port=args.port,
+        unix_socket=args.unix_socket
+    )
+    summary = asyncio.run(generator.run())
+    print(json.dumps(summary, indent=2))
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,12 +5,15 @@ import numpy as np
 import sounddevice as sd
 import whisper
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QPushButton, QLabel, 
-                            QVBoxLayout, QWidget, QComboBox, QHBoxLayout, QTextEdit, QMenu)
+                            QVBoxLayout, QWidget, QComboBox, QHBoxLayout, QMenu,
+                            QLineEdit, QListView)
 from PyQt5.QtCore import Qt, pyqtSignal, QObject
 import pyttsx3
 from skills_manager import SkillsManager
 from command_processor import CommandProcessor
 from whisper_integration import create_whisper_recognizer, WhisperTranscriber
+from model_scheduler import AdaptiveScheduler
+from skill_list_model import SkillListModel
 from auto_settings import Settings
 
 class SignalEmitter(QObject):
@@ -38,6 +41,7 @@ class VoiceCommandApp:
         
         # Initialize Whisper recognizer
         self.recognizer = WhisperTranscriber()
+        self.scheduler = AdaptiveScheduler(self.recognizer, self.settings)
         
         # Initialize UI
         self.app = QApplication(sys.argv)
@@ -63,6 +67,7 @@ class VoiceCommandApp:
         
         # Add Whisper model selection to settings menu
         whisper_menu = settings_menu.addMenu("Whisper Model")
+        whisper_menu.setObjectName("Whisper Model")
         
         model_options = {
             "tiny": "Tiny (Fastest)",
@@ -81,6 +86,10 @@ class VoiceCommandApp:
             action.setChecked(model_name == current_model)
             action.triggered.connect(lambda checked, m=model_name: self.set_whisper_model(m))
         
+        # Reloading updates the commands list through the skills manager listener
+        reload_action = settings_menu.addAction("Reload Skills")
+        reload_action.triggered.connect(lambda checked: self.skills_manager.reload_skills())
+        
         # Add microphone selection
         mic_label = QLabel("Select Microphone:")
         layout.addWidget(mic_label)
@@ -100,23 +109,18 @@ class VoiceCommandApp:
         layout.addWidget(self.status_label)
         
         # Add commands list
-        commands_label = QLabel("Available Commands:")
-        layout.addWidget(commands_label)
-        
-        self.commands_list = QTextEdit()
-        self.commands_list.setReadOnly(True)
-        layout.addWidget(self.commands_list)
+        self.add_commands_panel(layout)
         
         # Connect signals
         self.signal_emitter.status_changed.connect(self.status_label.setText)
         
         # Show the window
         self.main_window.show()
-        
-        # Update commands list
-        self.update_commands_list()
 
     def listen_loop(self):
+        # Calibration runs alongside listening and switches model when done
+        self.scheduler.calibrate_in_background()
+        
         while True:
             if not self.listening:
                 time.sleep(0.5)
@@ -199,7 +203,13 @@ class VoiceCommandApp:
                 audio_data = audio_data / np.max(np.abs(audio_data))
                 
             # Use Whisper to transcribe
-            result = self.recognizer.model.transcribe(audio_data, fp16=False)
+            result = self.scheduler.transcribe_detailed(audio_data)
+            if not self.scheduler.is_confident(result):
+                if result["text"]:
+                    print(f"Dropped low-confidence transcription: {result['text']} "
+                          f"(avg_logprob: {result['avg_logprob']}, "
+                          f"compression_ratio: {result['compression_ratio']})")
+                return ""
             return result["text"]
         except Exception as e:
             print(f"Error in process_audio: {e}")
@@ -242,13 +252,8 @@ class VoiceCommandApp:
         self.toggle_button.clicked.connect(self.toggle_listening)
         layout.addWidget(self.toggle_button)
         
-        # Add available commands label
-        commands_label = QLabel("Available Commands:")
-        layout.addWidget(commands_label)
-        
-        self.commands_list = QLabel()
-        self.update_commands_list()
-        layout.addWidget(self.commands_list)
+        # Add available commands list
+        self.add_commands_panel(layout)
         
         # Set layout and central widget
         central_widget.setLayout(layout)
@@ -276,12 +281,29 @@ class VoiceCommandApp:
             # Save the selected device to settings
             self.settings.set_audio_device(device_id, device_name)
     
-    def update_commands_list(self):
-        commands_text = ""
-        for name, skill in self.skills_manager.get_all_skills().items():
-            commands_text += f"• {name}: {skill.description}\n"
+    def add_commands_panel(self, layout):
+        """Add the searchable list of available commands to layout"""
+        commands_label = QLabel("Available Commands:")
+        layout.addWidget(commands_label)
+        
+        self.commands_filter = QLineEdit()
+        self.commands_filter.setPlaceholderText("Search commands")
+        self.commands_filter.setClearButtonEnabled(True)
+        layout.addWidget(self.commands_filter)
         
-        self.commands_list.setText(commands_text)
+        # The model follows the skills manager, so the list stays current
+        # when skills are registered or reloaded
+        self.commands_model = SkillListModel(self.skills_manager)
+        self.commands_filter.textChanged.connect(self.commands_model.set_filter)
+        
+        self.commands_list = QListView()
+        self.commands_list.setUniformItemSizes(True)
+        self.commands_list.setEditTriggers(QListView.NoEditTriggers)
+        self.commands_list.setModel(self.commands_model)
+        layout.addWidget(self.commands_list)
+    
+    def update_commands_list(self):
+        self.commands_model.refresh()
         
     def toggle_listening(self):
         """Toggle listening state"""
@@ -321,9 +343,8 @@ class VoiceCommandApp:
         # Show status message
         self.signal_emitter.status_changed.emit(f"Whisper model changed to {model_name}")
         
-        # Reload the model in the transcriber
-        if hasattr(self, 'transcriber'):
-            self.transcriber.set_model(model_name)
+        # Reload the model on the listening thread before the next transcription
+        self.scheduler.request_model(model_name)
 
     def process_command(self, text):
         """Process the recognized text as a command"""
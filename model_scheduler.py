@@ -0,0 +1,310 @@
+import os
+import json
+import time
+import platform
+import threading
+from collections import deque
+import numpy as np
+import torch
+import weight_cache
+from whisper_integration import WhisperTranscriber
+
+MODEL_SIZES = ["tiny", "base", "small", "medium", "large"]
+SAMPLE_RATE = 16000
+CALIBRATION_SECONDS = 5
+CALIBRATION_TOKENS = 32
+# Observed real-time factor this far above calibration means the CPU is contended
+CONTENTION_FACTOR = 1.5
+# Only step up when the larger model is predicted to stay this far under target
+STEP_UP_MARGIN = 0.8
+
+class AdaptiveScheduler:
+    """
+    Picks the Whisper model size and torch thread count to meet a latency target.
+
+    Wraps a WhisperTranscriber and measures the latency, queue wait and real-time
+    factor of every transcription. When the p95 latency is over the target set in
+    the "scheduler" settings it reduces threads under CPU contention or steps
+    down to a smaller model; when there is headroom it steps back up towards the
+    model chosen in the "whisper" settings. Only models already on disk (as a
+    checkpoint or weight cache) are considered, so nothing is downloaded.
+    Per-model timings from a startup calibration run are stored per machine and
+    used to predict the effect of each change.
+    """
+
+    def __init__(self, transcriber, settings=None):
+        self.transcriber = transcriber
+        self.settings = settings or transcriber.settings
+        self.enabled = self.settings.get("scheduler", "enabled", True)
+        self.target_ms = self.settings.get("scheduler", "target_p95_ms", 2000)
+        self.headroom = self.settings.get("scheduler", "headroom", 0.5)
+        self.evaluate_every = self.settings.get("scheduler", "evaluate_every", 5)
+        self.calibration_file = self.settings.get("scheduler", "calibration_file", "scheduler_calibration.json")
+        self.calibration_budget = self.settings.get("scheduler", "calibration_budget_s", 30)
+        self.samples = deque(maxlen=self.settings.get("scheduler", "window", 20))
+        self.calls_since_evaluation = 0
+        self.calibration = {}
+        self.pending_model = None
+        # Models that failed to load or decode in this process
+        self.unavailable_models = set()
+        # Held while transcribing or timing, since the model, thread count and
+        # calibration data are shared with the calibration thread
+        self.lock = threading.RLock()
+
+        cpu_threads = torch.get_num_threads()
+        self.threads = cpu_threads
+        self.thread_options = sorted({1, max(1, cpu_threads // 2), cpu_threads})
+
+    @property
+    def current_model(self):
+        return self.transcriber.loaded_model_name or self.settings.get("whisper", "model", "tiny")
+
+    def _allowed_models(self):
+        """Models the scheduler may use, smallest first"""
+        max_model = self.settings.get("whisper", "model", "tiny")
+        if max_model not in MODEL_SIZES:
+            return [max_model]
+        min_model = self.settings.get("scheduler", "min_model", "tiny")
+        low = MODEL_SIZES.index(min_model) if min_model in MODEL_SIZES else 0
+        high = MODEL_SIZES.index(max_model)
+        cache_dir = self.settings.get("whisper", "weight_cache_dir")
+        models = [
+            m for m in MODEL_SIZES[min(low, high):high + 1]
+            if m == self.current_model
+            or (m not in self.unavailable_models and weight_cache.is_available_locally(m, cache_dir))
+        ]
+        return models or [self.current_model]
+
+    def _machine_key(self):
+        device = self.transcriber.model.device.type if self.transcriber.model is not None else "cpu"
+        return "|".join([
+            platform.node(), platform.machine(), str(os.cpu_count()), torch.__version__, device
+        ])
+
+    def _load_calibration_file(self):
+        if os.path.exists(self.calibration_file):
+            try:
+                with open(self.calibration_file, 'r') as f:
+                    return json.load(f)
+            except Exception as e:
+                print(f"Error loading scheduler calibration: {e}")
+        return {}
+
+    def _save_calibration_file(self, stored):
+        try:
+            with open(self.calibration_file, 'w') as f:
+                json.dump(stored, f, indent=2)
+        except Exception as e:
+            print(f"Error saving scheduler calibration: {e}")
+
+    def calibrate_in_background(self):
+        """Run calibrate on a daemon thread so transcription can start right away"""
+        thread = threading.Thread(target=self._calibrate_safely, daemon=True)
+        thread.start()
+        return thread
+
+    def _calibrate_safely(self):
+        try:
+            self.calibrate()
+        except Exception as e:
+            # Keep running with the model that is already loaded
+            print(f"Error calibrating scheduler: {e}")
+
+    def calibrate(self, force=False):
+        """
+        Time each allowed model at each thread count, or reuse stored results
+
+        Results are kept per machine in the calibration file, so only models not
+        yet measured on this machine are run, the loaded model first and then
+        from smallest to largest. No new model is started once
+        "calibration_budget_s" has passed; the rest are measured on a later
+        start. Afterwards the largest model expected to meet the target is
+        selected.
+        """
+        if not self.enabled:
+            return
+
+        stored = self._load_calibration_file()
+        key = self._machine_key()
+        entry = stored.get(key, {"models": {}})
+        models = self._allowed_models()
+        missing = models if force else [m for m in models if m not in entry["models"]]
+        missing.sort(key=lambda m: (m != self.current_model, models.index(m)))
+
+        if missing:
+            print(f"Scheduler: calibrating {', '.join(missing)} with {self.thread_options} threads")
+            # Low level noise so the clip is decoded rather than skipped as silence
+            audio = np.random.default_rng(0).normal(
+                0, 0.01, CALIBRATION_SECONDS * SAMPLE_RATE).astype(np.float32)
+            deadline = time.monotonic() + self.calibration_budget
+            for i, model_name in enumerate(missing):
+                if time.monotonic() > deadline:
+                    print(f"Scheduler: calibration time budget used, deferring {', '.join(missing[i:])}")
+                    break
+                rtf = self._calibrate_model(model_name, audio)
+                if rtf is None:
+                    continue
+                best_threads = int(min(rtf, key=rtf.get))
+                entry["models"][model_name] = {"rtf": rtf, "best_threads": best_threads}
+                print(f"Scheduler: calibrated {model_name}: real-time factor by threads {rtf}, "
+                      f"best {best_threads}")
+
+            entry["updated"] = time.strftime("%Y-%m-%d %H:%M:%S")
+            stored[key] = entry
+            self._save_calibration_file(stored)
+        else:
+            print(f"Scheduler: using stored calibration for {', '.join(models)}")
+
+        with self.lock:
+            self.calibration = entry["models"]
+            self._choose_initial(self._allowed_models())
+
+    def _calibrate_model(self, model_name, audio):
+        """Return real-time factor by thread count, or None if the model is unusable"""
+        try:
+            if model_name == self.current_model:
+                transcriber = self.transcriber
+            else:
+                # A separate instance, so the model in use for listening is untouched
+                transcriber = WhisperTranscriber(model_name=model_name)
+                if transcriber.loaded_model_name != model_name:
+                    # Timings of the fallback model must not be stored under this name
+                    print(f"Scheduler: could not load {model_name}, skipping it")
+                    self.unavailable_models.add(model_name)
+                    return None
+            with self.lock:
+                transcriber.transcribe_batch([audio], early_exit=False, sample_len=CALIBRATION_TOKENS)
+            rtf = {}
+            for threads in self.thread_options:
+                # One measurement at a time, so live transcriptions only wait for
+                # a single decode and never run with the calibration thread count
+                with self.lock:
+                    try:
+                        torch.set_num_threads(threads)
+                        started = time.perf_counter()
+                        transcriber.transcribe_batch([audio], early_exit=False, sample_len=CALIBRATION_TOKENS)
+                        rtf[str(threads)] = (time.perf_counter() - started) / CALIBRATION_SECONDS
+                    finally:
+                        torch.set_num_threads(self.threads)
+            return rtf
+        except Exception as e:
+            print(f"Scheduler: error calibrating {model_name}, skipping it: {e}")
+            self.unavailable_models.add(model_name)
+            return None
+
+    def _choose_initial(self, models):
+        chosen = models[0]
+        for model_name in reversed(models):
+            rtf = self._calibrated_rtf(model_name, self._best_threads(model_name))
+            if rtf is not None and rtf * CALIBRATION_SECONDS * 1000 <= self.target_ms * STEP_UP_MARGIN:
+                chosen = model_name
+                break
+        self._apply(chosen, self._best_threads(chosen), "calibration finished")
+
+    def _best_threads(self, model_name):
+        return self.calibration.get(model_name, {}).get("best_threads", self.threads)
+
+    def _calibrated_rtf(self, model_name, threads):
+        return self.calibration.get(model_name, {}).get("rtf", {}).get(str(threads))
+
+    def _apply(self, model_name, threads, reason):
+        """Switch model and thread count, logging the decision"""
+        if model_name != self.current_model and not self.transcriber.use_model(model_name):
+            self.unavailable_models.add(model_name)
+            reason = f"{reason}; could not load {model_name}"
+        if threads != self.threads:
+            torch.set_num_threads(threads)
+            self.threads = threads
+        print(f"Scheduler: {reason}; using {self.current_model} with {threads} threads")
+        # Measurements of the previous configuration no longer apply
+        self.samples.clear()
+        self.calls_since_evaluation = 0
+
+    def request_model(self, model_name):
+        """Switch to a user-selected model before the next transcription"""
+        self.pending_model = model_name
+
+    def transcribe_batch(self, audio_batch, enqueued_at=None):
+        """
+        Transcribe through the wrapped transcriber and record timings
+
+        enqueued_at holds time.monotonic() timestamps for when each clip became
+        ready, so time spent waiting in a queue counts towards latency.
+        """
+        with self.lock:
+            if self.pending_model:
+                model_name, self.pending_model = self.pending_model, None
+                self._apply(model_name, self._best_threads(model_name), f"{model_name} selected by user")
+
+            started = time.monotonic()
+            results = self.transcriber.transcribe_batch(audio_batch)
+            processing = time.monotonic() - started
+
+            audio_seconds = sum(np.asarray(audio).size for audio in audio_batch) / SAMPLE_RATE
+            rtf = processing / audio_seconds if audio_seconds else 0.0
+            for i in range(len(audio_batch)):
+                wait = started - enqueued_at[i] if enqueued_at else 0.0
+                self.samples.append((wait + processing, wait, rtf))
+
+            self.calls_since_evaluation += 1
+            if self.enabled and self.calls_since_evaluation >= self.evaluate_every:
+                self._evaluate()
+            return results
+
+    def transcribe_detailed(self, audio, enqueued_at=None):
+        """Transcribe one clip; see WhisperTranscriber.transcribe_detailed"""
+        return self.transcribe_batch([audio], [enqueued_at] if enqueued_at else None)[0]
+
+    def is_confident(self, result):
+        return self.transcriber.is_confident(result)
+
+    def _evaluate(self):
+        """Compare recent latency with the target and adjust if needed"""
+        self.calls_since_evaluation = 0
+        latencies = [sample[0] for sample in self.samples]
+        p95_ms = float(np.percentile(latencies, 95)) * 1000
+        wait_p95_ms = float(np.percentile([sample[1] for sample in self.samples], 95)) * 1000
+        rtf = float(np.mean([sample[2] for sample in self.samples]))
+
+        model_name = self.current_model
+        models = self._allowed_models()
+        status = (f"p95 latency {p95_ms:.0f} ms (target {self.target_ms} ms), "
+                  f"queue wait p95 {wait_p95_ms:.0f} ms, real-time factor {rtf:.2f}")
+
+        if model_name not in models:
+            # The user lowered the maximum model since the last switch
+            self._apply(models[-1], self._best_threads(models[-1]), f"{status}; {model_name} no longer allowed")
+            return
+        index = models.index(model_name)
+
+        if p95_ms > self.target_ms:
+            expected_rtf = self._calibrated_rtf(model_name, self.threads)
+            fewer_threads = [n for n in self.thread_options if n < self.threads]
+            more_threads = [n for n in self.thread_options if n > self.threads]
+            if expected_rtf and rtf > expected_rtf * CONTENTION_FACTOR and fewer_threads:
+                self._apply(model_name, fewer_threads[-1], f"{status}; CPU contention, reducing threads")
+            elif index > 0:
+                smaller = models[index - 1]
+                self._apply(smaller, self._best_threads(smaller), f"{status}; stepping down")
+            elif more_threads:
+                self._apply(model_name, more_threads[0], f"{status}; increasing threads")
+            else:
+                print(f"Scheduler: {status}; over target with no smaller model or thread option left")
+            return
+
+        if p95_ms < self.target_ms * self.headroom and index < len(models) - 1:
+            bigger = models[index + 1]
+            current_rtf = self._calibrated_rtf(model_name, self.threads)
+            bigger_rtf = self._calibrated_rtf(bigger, self._best_threads(bigger))
+            if current_rtf and bigger_rtf:
+                predicted_ms = p95_ms * bigger_rtf / current_rtf
+                if predicted_ms < self.target_ms * STEP_UP_MARGIN:
+                    self._apply(bigger, self._best_threads(bigger),
+                                f"{status}; stepping up, predicted p95 {predicted_ms:.0f} ms")
+                    return
+                print(f"Scheduler: {status}; keeping {model_name}, {bigger} predicted at {predicted_ms:.0f} ms")
+                return
+            print(f"Scheduler: {status}; keeping {model_name}, no calibration for {bigger}")
+            return
+
+        print(f"Scheduler: {status}; keeping {model_name} with {self.threads} threads")
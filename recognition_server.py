@@ -0,0 +1,292 @@
+import sys
+import json
+import time
+import asyncio
+import argparse
+import itertools
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from skills_manager import SkillsManager
+from command_processor import CommandProcessor
+from whisper_integration import WhisperTranscriber
+from model_scheduler import AdaptiveScheduler
+from auto_settings import Settings
+
+class Endpointer:
+    """
+    Energy based endpointing for a single PCM stream.
+
+    Audio is split into short frames; an utterance starts on the first frame
+    above the energy threshold and ends after a run of quiet frames or when it
+    reaches the maximum length.
+    """
+
+    def __init__(self, sample_rate=16000, frame_ms=30, energy_threshold=0.01,
+                 silence_ms=600, min_speech_ms=200, max_utterance_s=15, pre_roll_ms=200):
+        self.frame_size = int(sample_rate * frame_ms / 1000)
+        self.energy_threshold = energy_threshold
+        self.silence_frames = max(1, silence_ms // frame_ms)
+        self.min_speech_frames = max(1, min_speech_ms // frame_ms)
+        self.max_frames = max(1, int(max_utterance_s * 1000) // frame_ms)
+        self.pre_roll = deque(maxlen=max(1, pre_roll_ms // frame_ms))
+        self.pending = np.zeros(0, dtype=np.float32)
+        self._reset()
+
+    def _reset(self):
+        self.in_speech = False
+        self.frames = []
+        self.voiced_frames = 0
+        self.silent_run = 0
+
+    def feed(self, samples):
+        """
+        Add float32 samples to the stream
+
+        Returns:
+        list: utterances (float32 arrays) completed by this chunk
+        """
+        self.pending = np.concatenate([self.pending, samples])
+        utterances = []
+
+        n_frames = len(self.pending) // self.frame_size
+        for i in range(n_frames):
+            frame = self.pending[i * self.frame_size:(i + 1) * self.frame_size]
+            utterance = self._process_frame(frame)
+            if utterance is not None:
+                utterances.append(utterance)
+
+        self.pending = self.pending[n_frames * self.frame_size:]
+        return utterances
+
+    def flush(self):
+        """Return the utterance in progress at end of stream, if any"""
+        if self.in_speech and len(self.pending):
+            self.frames.append(self.pending)
+        self.pending = np.zeros(0, dtype=np.float32)
+        return self._finish() if self.in_speech else None
+
+    def _process_frame(self, frame):
+        voiced = np.sqrt(np.mean(frame ** 2)) >= self.energy_threshold
+
+        if not self.in_speech:
+            if not voiced:
+                self.pre_roll.append(frame)
+                return None
+            self.in_speech = True
+            self.frames = list(self.pre_roll)
+            self.pre_roll.clear()
+
+        self.frames.append(frame)
+        if voiced:
+            self.voiced_frames += 1
+            self.silent_run = 0
+        else:
+            self.silent_run += 1
+
+        if self.silent_run >= self.silence_frames or len(self.frames) >= self.max_frames:
+            return self._finish()
+        return None
+
+    def _finish(self):
+        utterance = None
+        if self.voiced_frames >= self.min_speech_frames:
+            utterance = np.concatenate(self.frames)
+        self._reset()
+        return utterance
+
+class BatchDecoder:
+    """
+    Collects utterances from every stream and decodes them together.
+
+    A single worker thread owns the model, so while one batch is being decoded
+    new utterances queue up and go into the next forward pass. Decoding goes
+    through the scheduler so queue wait counts towards its latency target.
+    """
+
+    def __init__(self, scheduler, command_processor, max_batch_size=8, batch_window_ms=50):
+        self.scheduler = scheduler
+        self.command_processor = command_processor
+        self.max_batch_size = max_batch_size
+        self.batch_window = batch_window_ms / 1000.0
+        self.queue = asyncio.Queue()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+    def submit(self, audio):
+        """Queue an utterance and return a future for its result"""
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((audio, time.monotonic(), future))
+        return future
+
+    async def run(self):
+        """Decode queued utterances in batches until cancelled"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.max_batch_size:
+                if not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            audios = [audio for audio, _, _ in batch]
+            enqueued = [enqueued_at for _, enqueued_at, _ in batch]
+            try:
+                results = await loop.run_in_executor(self.executor, self._decode, audios, enqueued)
+            except Exception as e:
+                print(f"Error decoding batch: {e}")
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            now = time.monotonic()
+            for (_, enqueued_at, future), result in zip(batch, results):
+                result["latency_ms"] = round((now - enqueued_at) * 1000, 1)
+                result["batch_size"] = len(batch)
+                if not future.done():
+                    future.set_result(result)
+
+    def _decode(self, audios, enqueued):
+        results = self.scheduler.transcribe_batch(audios, enqueued_at=enqueued)
+        for result in results:
+            skill_name = None
+            result["accepted"] = self.scheduler.is_confident(result)
+            if result["accepted"]:
+                skill_name, _ = self.command_processor.process_command(result["text"])
+            result["skill"] = skill_name
+        return results
+
+class RecognitionServer:
+    """
+    Headless server that accepts raw PCM streams and returns matched commands.
+
+    Clients send 16-bit little-endian mono PCM at 16 kHz and half-close the
+    connection when done. For every utterance the server writes one JSON line
+    with the recognized text and the matched skill name.
+    """
+
+    def __init__(self, settings=None, max_batch_size=None, batch_window_ms=None):
+        self.settings = settings or Settings()
+        self.max_batch_size = max_batch_size or self.settings.get("server", "max_batch_size", 8)
+        if batch_window_ms is None:
+            batch_window_ms = self.settings.get("server", "batch_window_ms", 50)
+        self.batch_window_ms = batch_window_ms
+        self.skills_manager = SkillsManager()
+        self.command_processor = CommandProcessor(self.skills_manager)
+        self.transcriber = WhisperTranscriber()
+        self.scheduler = AdaptiveScheduler(self.transcriber, self.settings)
+        self.decoder = None
+        self.stream_ids = itertools.count(1)
+
+    def _create_endpointer(self):
+        return Endpointer(
+            sample_rate=16000,
+            energy_threshold=self.settings.get("server", "energy_threshold", 0.01),
+            silence_ms=self.settings.get("server", "silence_ms", 600),
+            max_utterance_s=self.settings.get("server", "max_utterance_s", 15)
+        )
+
+    async def handle_client(self, reader, writer):
+        """Run endpointing for one connection and stream results back"""
+        stream_id = next(self.stream_ids)
+        print(f"Stream {stream_id} connected")
+        endpointer = self._create_endpointer()
+        results = asyncio.Queue()
+        sender = asyncio.create_task(self._send_results(stream_id, results, writer))
+        carry = b""
+
+        try:
+            while True:
+                data = await reader.read(8192)
+                if not data:
+                    break
+                data = carry + data
+                usable = len(data) - len(data) % 2
+                carry = data[usable:]
+                samples = np.frombuffer(data[:usable], dtype="<i2").astype(np.float32) / 32768.0
+                for utterance in endpointer.feed(samples):
+                    results.put_nowait(self.decoder.submit(utterance))
+
+            utterance = endpointer.flush()
+            if utterance is not None:
+                results.put_nowait(self.decoder.submit(utterance))
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            print(f"Stream {stream_id} error: {e}")
+        finally:
+            results.put_nowait(None)
+            await sender
+            writer.close()
+            print(f"Stream {stream_id} closed")
+
+    async def _send_results(self, stream_id, results, writer):
+        """Write results for one stream in utterance order"""
+        for index in itertools.count():
+            future = await results.get()
+            if future is None:
+                return
+            try:
+                result = await future
+            except Exception as e:
+                result = {"text": "", "skill": None, "error": str(e)}
+
+            response = dict(result, stream=stream_id, utterance=index)
+            try:
+                writer.write((json.dumps(response) + "\n").encode("utf-8"))
+                await writer.drain()
+            except ConnectionError:
+                pass
+
+    async def serve(self, host=None, port=None, unix_socket=None):
+        """Start listening and run until cancelled"""
+        self.decoder = BatchDecoder(
+            self.scheduler,
+            self.command_processor,
+            max_batch_size=self.max_batch_size,
+            batch_window_ms=self.batch_window_ms
+        )
+        # Calibration runs alongside serving and switches model when done
+        self.scheduler.calibrate_in_background()
+        decoder_task = asyncio.create_task(self.decoder.run())
+
+        if unix_socket:
+            server = await asyncio.start_unix_server(self.handle_client, path=unix_socket)
+            print(f"Recognition server listening on {unix_socket}")
+        else:
+            server = await asyncio.start_server(self.handle_client, host, port)
+            print(f"Recognition server listening on {host}:{port}")
+
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            decoder_task.cancel()
+
+def main(argv=None):
+    settings = Settings()
+    parser = argparse.ArgumentParser(description="Headless multi-stream voice command server")
+    parser.add_argument("--host", default=settings.get("server", "host", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=settings.get("server", "port", 8765))
+    parser.add_argument("--unix-socket", default=settings.get("server", "unix_socket"),
+                        help="Listen on a Unix domain socket instead of TCP")
+    parser.add_argument("--max-batch-size", type=int,
+                        default=settings.get("server", "max_batch_size", 8))
+    parser.add_argument("--batch-window-ms", type=float,
+                        default=settings.get("server", "batch_window_ms", 50))
+    args = parser.parse_args(argv)
+
+    server = RecognitionServer(settings, args.max_batch_size, args.batch_window_ms)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix_socket))
+    except KeyboardInterrupt:
+        print("Recognition server stopped")
+
+if __name__ == "__main__":
+    sys.exit(main())
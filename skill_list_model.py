@@ -0,0 +1,101 @@
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, pyqtSignal
+
+class SkillListModel(QAbstractListModel):
+    """
+    List model over the skills in a SkillsManager.
+
+    Rows hold only skill names and their text is formatted when the view asks
+    for it. Rows are handed to the view in batches through fetchMore, so large
+    catalogs do not have to be laid out up front. Filtering uses the
+    SkillsManager search index (case-insensitive word prefixes), which is
+    separate from the match index used for fuzzy command matching (exact,
+    case-sensitive words and whole keyword phrases), so a skill shown for a
+    filter is not necessarily one a spoken command with those words selects.
+    """
+
+    # Carries SkillsManager notifications onto the UI thread
+    skills_changed = pyqtSignal(str, list)
+
+    FETCH_BATCH_SIZE = 500
+
+    def __init__(self, skills_manager, parent=None):
+        super().__init__(parent)
+        self.skills_manager = skills_manager
+        self.filter_text = ""
+        self.names = []
+        self.rows = {}
+        self.loaded = 0
+
+        self.skills_changed.connect(self._on_skills_changed)
+        skills_manager.add_listener(self.skills_changed.emit)
+        self.refresh()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.loaded
+
+    def canFetchMore(self, parent):
+        return not parent.isValid() and self.loaded < len(self.names)
+
+    def fetchMore(self, parent):
+        if parent.isValid():
+            return
+        count = min(self.FETCH_BATCH_SIZE, len(self.names) - self.loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self.loaded, self.loaded + count - 1)
+        self.loaded += count
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= self.loaded:
+            return None
+
+        skill = self.skills_manager.get_skill(self.names[index.row()])
+        if skill is None:
+            return None
+        if role == Qt.DisplayRole:
+            return f"• {skill.name}: {skill.description}"
+        if role == Qt.ToolTipRole and skill.keywords:
+            return f"Keywords: {', '.join(skill.keywords)}"
+        return None
+
+    def set_filter(self, text):
+        """Show only skills matching text"""
+        self.filter_text = text
+        self.refresh()
+
+    def refresh(self):
+        """Rebuild the rows from the skills manager"""
+        self.beginResetModel()
+        self.names = self.skills_manager.search(self.filter_text)
+        self.rows = {name: row for row, name in enumerate(self.names)}
+        self.loaded = min(self.FETCH_BATCH_SIZE, len(self.names))
+        self.endResetModel()
+
+    def _on_skills_changed(self, event, names):
+        if event != "registered":
+            self.refresh()
+            return
+
+        for name in names:
+            row = self.rows.get(name)
+            if row is not None:
+                # Replaced skill: redraw its row if the view has it
+                if row < self.loaded:
+                    index = self.index(row)
+                    self.dataChanged.emit(index, index)
+                continue
+            if not self.skills_manager.matches(name, self.filter_text):
+                continue
+
+            # New skills register last, so they go at the end of the list
+            row = len(self.names)
+            self.rows[name] = row
+            if self.loaded == row:
+                self.beginInsertRows(QModelIndex(), row, row)
+                self.names.append(name)
+                self.loaded += 1
+                self.endInsertRows()
+            else:
+                # Not fetched yet; the view picks it up through fetchMore
+                self.names.append(name)
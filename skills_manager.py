@@ -1,3 +1,6 @@
+import re
+import threading
+from bisect import bisect_left
 from browser_skill import ApplicationSkill
 
 class Skill:
@@ -7,11 +10,92 @@ class Skill:
         self.action = action
         self.keywords = keywords or []
 
-class SkillsManager:
+def index_words(text):
+    """Split text into the lowercase words used by the search index"""
+    return set(re.findall(r'\b\w+\b', text.lower()))
+
+def match_words(skill):
+    """
+    Words used for fuzzy command matching: the name and description words as
+    written, plus each keyword phrase as a whole
+    """
+    words = set(re.findall(r'\b\w+\b', f"{skill.name} {skill.description}"))
+    words.update(skill.keywords)
+    return words
+
+class SkillCatalog:
+    """
+    A set of skills and the indexes built from them.
+
+    SkillsManager replaces its catalog as a whole on reload, so code holding a
+    catalog never sees a partly loaded one.
+    """
+
     def __init__(self):
         self.skills = {}
+        # Inverted index from lowercase word to the names of skills using it,
+        # built from each skill's name, description and keywords, for search
+        self.index = {}
+        self.skill_words = {}
+        # Inverted index of match_words, for fuzzy command matching. It differs
+        # from the search index on purpose, so search and matching can disagree
+        self.match_index = {}
+        self.skill_match_words = {}
+        self.order = {}
+        self.next_order = 0
+        self.sorted_words = None
+
+    def add(self, skill):
+        """Add a skill, replacing any skill with the same name"""
+        if skill.name in self.skills:
+            self.remove_from_index(skill.name)
+        else:
+            self.order[skill.name] = self.next_order
+            self.next_order += 1
+        self.skills[skill.name] = skill
+
+        words = index_words(f"{skill.name} {skill.description} {' '.join(skill.keywords)}")
+        self.skill_words[skill.name] = words
+        for word in words:
+            if word not in self.index:
+                self.index[word] = set()
+                self.sorted_words = None
+            self.index[word].add(skill.name)
+
+        words = match_words(skill)
+        self.skill_match_words[skill.name] = words
+        for word in words:
+            self.match_index.setdefault(word, set()).add(skill.name)
+
+    def remove_from_index(self, name):
+        for word in self.skill_words.pop(name, ()):
+            names = self.index.get(word)
+            if names is not None:
+                names.discard(name)
+                if not names:
+                    del self.index[word]
+                    self.sorted_words = None
+
+        for word in self.skill_match_words.pop(name, ()):
+            names = self.match_index.get(word)
+            if names is not None:
+                names.discard(name)
+                if not names:
+                    del self.match_index[word]
+
+class SkillsManager:
+    def __init__(self):
+        self._catalog = SkillCatalog()
+        # Catalog being filled by reload_skills, swapped in once complete
+        self._loading = None
+        self._write_lock = threading.RLock()
+        self._listeners = []
         self._load_skills_from_config()
     
+    @property
+    def skills(self):
+        return self._catalog.skills
+    
     def _load_skills_from_config(self):
         """Load all skills from configuration files"""
         # Create application skill manager and register skills
@@ -28,7 +112,106 @@ class SkillsManager:
     
     def register_skill(self, name, description, action, keywords=None):
         """Register a new skill"""
-        self.skills[name] = Skill(name, description, action, keywords)
+        with self._write_lock:
+            loading = self._loading is not None
+            (self._loading if loading else self._catalog).add(Skill(name, description, action, keywords))
+        # Listeners get a single reset after a reload instead of one event per skill
+        if not loading:
+            self._notify("registered", [name])
+    
+    def reload_skills(self):
+        """Reload all skills from configuration files"""
+        with self._write_lock:
+            # Load into a new catalog so other threads keep using the complete
+            # old one, then swap it in with a single assignment
+            self._loading = SkillCatalog()
+            try:
+                self._load_skills_from_config()
+                self._catalog = self._loading
+            finally:
+                self._loading = None
+        self._notify("reset", [])
+    
+    def add_listener(self, callback):
+        """
+        Call callback(event, names) when skills change
+        
+        event is "registered" with the names of new or replaced skills, or
+        "reset" after the whole catalog was reloaded. Callbacks run on the
+        thread that changed the skills.
+        """
+        self._listeners.append(callback)
+    
+    def _notify(self, event, names):
+        for callback in self._listeners:
+            try:
+                callback(event, names)
+            except Exception as e:
+                print(f"Error in skills listener: {e}")
+    
+    def count_word_matches(self, words):
+        """
+        Count how many of the given words each skill contains
+        
+        Words are compared exactly against match_words, so results are the same
+        as intersecting the words with every skill's word set.
+        
+        Returns:
+        dict: skill name to number of matching words, for skills with at least one
+        """
+        match_index = self._catalog.match_index
+        counts = {}
+        for word in words:
+            for name in match_index.get(word, ()):
+                counts[name] = counts.get(name, 0) + 1
+        return counts
+    
+    def registration_order(self, name):
+        """Position of a skill in registration order"""
+        catalog = self._catalog
+        return catalog.order.get(name, catalog.next_order)
+    
+    def _names_with_prefix(self, catalog, prefix):
+        if catalog.sorted_words is None:
+            catalog.sorted_words = sorted(catalog.index)
+        sorted_words = catalog.sorted_words
+        names = set()
+        i = bisect_left(sorted_words, prefix)
+        while i < len(sorted_words) and sorted_words[i].startswith(prefix):
+            names.update(catalog.index[sorted_words[i]])
+            i += 1
+        return names
+    
+    def search(self, query):
+        """
+        Find skills matching a search query
+        
+        Every word of the query must be the start of a word in the skill's name,
+        description or keywords. An empty query matches all skills.
+        
+        Returns:
+        list: matching skill names in registration order
+        """
+        catalog = self._catalog
+        words = index_words(query)
+        if not words:
+            return list(catalog.skills)
+        
+        matches = None
+        for word in sorted(words, key=len, reverse=True):
+            names = self._names_with_prefix(catalog, word)
+            matches = names if matches is None else matches & names
+            if not matches:
+                return []
+        return sorted(matches, key=lambda name: catalog.order.get(name, catalog.next_order))
+    
+    def matches(self, name, query):
+        """Return True if the named skill matches a search query"""
+        skill_words = self._catalog.skill_words.get(name, set())
+        return all(
+            any(skill_word.startswith(word) for skill_word in skill_words)
+            for word in index_words(query)
+        )
     
     def get_skill(self, name):
         """Get a skill by name"""
@@ -0,0 +1,303 @@
+import os
+import sys
+import json
+import struct
+import hashlib
+import argparse
+import numpy as np
+import torch
+import whisper
+from whisper.model import Whisper, ModelDimensions, AudioEncoder, TextDecoder
+
+# File layout: fixed prefix, JSON header, then tensor data. The prefix holds the
+# header length and its SHA-256; each tensor starts on an ALIGNMENT boundary.
+MAGIC = b"AWC1"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+PREFIX = struct.Struct("<4sIQ32s")
+
+def default_cache_dir():
+    """Return the folder used for converted weights when none is configured"""
+    cache_home = os.getenv("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache"))
+    return os.path.join(cache_home, "auto_start", "weights")
+
+def _download_root():
+    # Same location whisper.load_model downloads checkpoints to
+    cache_home = os.getenv("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache"))
+    return os.path.join(cache_home, "whisper")
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+def _sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _expected_sha256(name):
+    """Checksum of an official checkpoint, taken from its download URL"""
+    if name in whisper._MODELS:
+        return whisper._MODELS[name].split("/")[-2]
+    return None
+
+def _checkpoint_path(name):
+    if name in whisper._MODELS:
+        return os.path.join(_download_root(), os.path.basename(whisper._MODELS[name]))
+    return name
+
+def cache_path_for(name, cache_dir=None):
+    """Return the cache file path for a model name or checkpoint path"""
+    cache_dir = cache_dir or default_cache_dir()
+    if name in whisper._MODELS:
+        file_name = f"{name}.awc"
+    else:
+        path_hash = hashlib.sha256(os.path.abspath(name).encode("utf-8")).hexdigest()[:12]
+        file_name = f"{os.path.splitext(os.path.basename(name))[0]}-{path_hash}.awc"
+    return os.path.join(cache_dir, file_name)
+
+def is_available_locally(name, cache_dir=None):
+    """Return True if a model can be loaded without downloading anything"""
+    return os.path.exists(cache_path_for(name, cache_dir)) or os.path.exists(_checkpoint_path(name))
+
+def read_header(cache_path):
+    """
+    Read and validate the header of a cache file
+
+    Raises ValueError if the file is not a cache file, was written by another
+    format version, has a corrupt header or is truncated.
+    """
+    with open(cache_path, 'rb') as f:
+        prefix = f.read(PREFIX.size)
+        if len(prefix) != PREFIX.size:
+            raise ValueError("cache file is truncated")
+        magic, version, header_len, header_sha = PREFIX.unpack(prefix)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError("not a weight cache file of this version")
+        header_bytes = f.read(header_len)
+
+    if hashlib.sha256(header_bytes).digest() != header_sha:
+        raise ValueError("header checksum mismatch")
+
+    header = json.loads(header_bytes)
+    header["data_start"] = _align(PREFIX.size + header_len)
+    if os.path.getsize(cache_path) != header["data_start"] + header["data_size"]:
+        raise ValueError("cache file size does not match header")
+    return header
+
+def verify_cache(cache_path):
+    """Check the tensor data of a cache file against its stored checksum"""
+    header = read_header(cache_path)
+    digest = hashlib.sha256()
+    with open(cache_path, 'rb') as f:
+        f.seek(header["data_start"])
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest() == header["data_sha256"]
+
+def source_matches(name, source):
+    """Return True if the checkpoint a cache was built from is unchanged"""
+    expected_sha = _expected_sha256(name)
+    if expected_sha and source.get("sha256") != expected_sha:
+        return False
+
+    path = _checkpoint_path(name)
+    if not os.path.exists(path):
+        # Official checkpoints are identified by the checksum in their URL
+        return expected_sha is not None
+
+    stat = os.stat(path)
+    if stat.st_size == source.get("size") and stat.st_mtime_ns == source.get("mtime_ns"):
+        return True
+    return _sha256_file(path) == source.get("sha256")
+
+def build_cache(name, cache_path):
+    """
+    Convert a Whisper checkpoint into a flat cache file
+
+    Weights are stored as float32 so they can be mapped and used on the CPU
+    without conversion. The file is written next to its final location and
+    moved into place once its checksum has been verified.
+    """
+    if name in whisper._MODELS:
+        checkpoint_path = whisper._download(whisper._MODELS[name], _download_root(), False)
+    elif os.path.isfile(name):
+        checkpoint_path = name
+    else:
+        raise RuntimeError(f"Model {name} not found; available models = {whisper.available_models()}")
+
+    stat = os.stat(checkpoint_path)
+    source = {
+        "checkpoint": os.path.abspath(checkpoint_path),
+        "sha256": _expected_sha256(name) or _sha256_file(checkpoint_path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns
+    }
+
+    with open(checkpoint_path, 'rb') as f:
+        checkpoint = torch.load(f, map_location="cpu")
+
+    arrays = []
+    tensors = []
+    offset = 0
+    digest = hashlib.sha256()
+    for key, tensor in checkpoint["model_state_dict"].items():
+        if tensor.is_floating_point():
+            tensor = tensor.float()
+        array = tensor.contiguous().numpy()
+        raw = array.reshape(-1).view(np.uint8)
+        padding = _align(offset) - offset
+        digest.update(b"\0" * padding)
+        digest.update(raw)
+        offset += padding
+        tensors.append({
+            "name": key,
+            "dtype": array.dtype.name,
+            "shape": list(array.shape),
+            "offset": offset,
+            "nbytes": array.nbytes
+        })
+        arrays.append((padding, raw))
+        offset += array.nbytes
+
+    header = {
+        "model": name,
+        "dims": checkpoint["dims"],
+        "source": source,
+        "tensors": tensors,
+        "data_size": offset,
+        "data_sha256": digest.hexdigest()
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+    prefix = PREFIX.pack(MAGIC, FORMAT_VERSION, len(header_bytes), hashlib.sha256(header_bytes).digest())
+    data_start = _align(PREFIX.size + len(header_bytes))
+
+    os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+    temp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(prefix)
+            f.write(header_bytes)
+            f.write(b"\0" * (data_start - PREFIX.size - len(header_bytes)))
+            for padding, raw in arrays:
+                f.write(b"\0" * padding)
+                f.write(raw)
+
+        if not verify_cache(temp_path):
+            raise ValueError("checksum mismatch after writing weight cache")
+        # Atomic, so processes already mapping the old file keep a valid view
+        os.replace(temp_path, cache_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    print(f"Built weight cache for {name}: {cache_path}")
+    return read_header(cache_path)
+
+def _map_state_dict(cache_path, header):
+    # Copy-on-write mapping: pages come straight from the page cache and are
+    # shared by every process mapping the same file until one writes to them
+    mapped = np.memmap(cache_path, dtype=np.uint8, mode="c")
+    state_dict = {}
+    for entry in header["tensors"]:
+        start = header["data_start"] + entry["offset"]
+        array = mapped[start:start + entry["nbytes"]].view(np.dtype(entry["dtype"]))
+        state_dict[entry["name"]] = torch.from_numpy(array.reshape(entry["shape"]))
+    return state_dict
+
+def _build_model(header, state_dict):
+    dims = ModelDimensions(**header["dims"])
+
+    # Same structure as Whisper.__init__, but the encoder and decoder are created
+    # on the meta device so no weights are allocated and initialised only to be
+    # replaced by the mapped tensors
+    model = Whisper.__new__(Whisper)
+    torch.nn.Module.__init__(model)
+    model.dims = dims
+    with torch.device("meta"):
+        model.encoder = AudioEncoder(
+            dims.n_mels, dims.n_audio_ctx, dims.n_audio_state, dims.n_audio_head, dims.n_audio_layer)
+        model.decoder = TextDecoder(
+            dims.n_vocab, dims.n_text_ctx, dims.n_text_state, dims.n_text_head, dims.n_text_layer)
+    model.load_state_dict(state_dict, assign=True)
+
+    # Non-persistent buffers are not in the checkpoint, so build them on the CPU
+    mask = torch.empty(dims.n_text_ctx, dims.n_text_ctx).fill_(-np.inf).triu_(1)
+    model.decoder.register_buffer("mask", mask, persistent=False)
+
+    name = header["model"]
+    if name in whisper._ALIGNMENT_HEADS:
+        model.set_alignment_heads(whisper._ALIGNMENT_HEADS[name])
+    else:
+        # Same default as Whisper.__init__: last half of the decoder layers
+        all_heads = torch.zeros(dims.n_text_layer, dims.n_text_head, dtype=torch.bool)
+        all_heads[dims.n_text_layer // 2:] = True
+        model.register_buffer("alignment_heads", all_heads.to_sparse(), persistent=False)
+
+    for key, tensor in list(model.named_parameters()) + list(model.named_buffers()):
+        if tensor.is_meta:
+            raise ValueError(f"weight cache is missing tensor {key}")
+    return model
+
+def load_model(name, cache_dir=None, device=None):
+    """
+    Load a Whisper model through the memory-mapped weight cache
+
+    The cache is built on first use and rebuilt when it is unreadable or the
+    source checkpoint has changed. On the CPU the model's weights are the
+    mapped file itself, so loading takes milliseconds and the memory is shared
+    between processes.
+    """
+    if device is None:
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+
+    cache_path = cache_path_for(name, cache_dir)
+    header = None
+    if os.path.exists(cache_path):
+        try:
+            header = read_header(cache_path)
+            if not source_matches(name, header["source"]):
+                print(f"Source checkpoint for {name} changed, rebuilding weight cache")
+                header = None
+        except (OSError, ValueError) as e:
+            print(f"Invalid weight cache {cache_path}: {e}")
+            header = None
+
+    if header is None:
+        header = build_cache(name, cache_path)
+
+    model = _build_model(header, _map_state_dict(cache_path, header))
+    if device != "cpu":
+        model = model.to(device)
+    return model
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the memory-mapped Whisper weight cache")
+    parser.add_argument("command", choices=["build", "verify"])
+    parser.add_argument("models", nargs="+", help="Model names or checkpoint paths")
+    parser.add_argument("--cache-dir", help="Cache folder (default: %(default)s)", default=default_cache_dir())
+    args = parser.parse_args(argv)
+
+    status = 0
+    for name in args.models:
+        cache_path = cache_path_for(name, args.cache_dir)
+        if args.command == "build":
+            build_cache(name, cache_path)
+            continue
+        try:
+            header = read_header(cache_path)
+            ok = verify_cache(cache_path) and source_matches(name, header["source"])
+            if ok:
+                # Build the model too, so a cache that cannot be used is reported
+                # here instead of silently falling back to the checkpoint
+                _build_model(header, _map_state_dict(cache_path, header))
+        except (OSError, ValueError, RuntimeError) as e:
+            print(f"{name}: {e}")
+            ok = False
+        print(f"{name}: {'ok' if ok else 'stale or corrupt'}")
+        status = status or (0 if ok else 1)
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
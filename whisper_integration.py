@@ -1,23 +1,47 @@
 import whisper
 import numpy as np
+import torch
+import weight_cache
 from auto_settings import Settings
 
 class WhisperTranscriber:
-    def __init__(self):
+    def __init__(self, model_name=None):
         self.settings = Settings()
+        # Overrides the model from settings without saving it
+        self.model_name = model_name
+        # Name of the model actually loaded, which differs after a fallback
+        self.loaded_model_name = None
         self.model = None
         self._load_model()
     
     def _load_model(self):
-        """Load the Whisper model based on settings"""
-        model_name = self.settings.get("whisper", "model", "tiny")
+        """
+        Load the Whisper model based on settings
+        
+        Returns:
+        bool: True if the requested model was loaded, False if it fell back to tiny
+        """
+        model_name = self.model_name or self.settings.get("whisper", "model", "tiny")
+        if self.settings.get("whisper", "use_weight_cache", True):
+            try:
+                self.model = weight_cache.load_model(
+                    model_name, self.settings.get("whisper", "weight_cache_dir"))
+                print(f"Loaded Whisper model from weight cache: {model_name}")
+                self.loaded_model_name = model_name
+                return True
+            except Exception as e:
+                print(f"Error loading weight cache, loading checkpoint instead: {e}")
         try:
             self.model = whisper.load_model(model_name)
             print(f"Loaded Whisper model: {model_name}")
+            self.loaded_model_name = model_name
+            return True
         except Exception as e:
             print(f"Error loading Whisper model: {e}")
             # Fall back to tiny model if there's an error
             self.model = whisper.load_model("tiny")
+            self.loaded_model_name = "tiny"
+            return model_name == "tiny"
     
     def transcribe(self, audio_data, sample_rate=16000):
         """Transcribe audio data using Whisper"""
@@ -35,10 +59,125 @@ class WhisperTranscriber:
         
         return result["text"].strip()
     
+    def transcribe_batch(self, audio_batch, early_exit=True, sample_len=None):
+        """
+        Transcribe several clips with a single encoder/decoder forward pass
+        
+        Each clip is mono float32 audio at 16 kHz in the range [-1, 1]. Clips are
+        padded or trimmed to Whisper's 30 second window and stacked into one mel
+        tensor, so this is meant for short utterances such as voice commands.
+        
+        The no-speech probability is read from the first decoder step. Clips above
+        the "no_speech_threshold" setting are not decoded any further when
+        early_exit is set. sample_len caps the number of decoded tokens.
+        
+        Returns:
+        list: one result dict per clip, in input order, with "text",
+        "no_speech_prob", "avg_logprob", "compression_ratio" and "skipped" keys
+        """
+        if self.model is None:
+            self._load_model()
+            
+        if self.model is None or not audio_batch:
+            return [self._empty_result() for _ in audio_batch]
+        
+        fp16 = self.model.device.type == "cuda"
+        n_mels = self.model.dims.n_mels
+        mels = []
+        for audio in audio_batch:
+            audio = whisper.pad_or_trim(np.asarray(audio, dtype=np.float32).flatten())
+            mels.append(whisper.log_mel_spectrogram(audio, n_mels=n_mels))
+        mel = torch.stack(mels).to(self.model.device, torch.float16 if fp16 else torch.float32)
+        
+        with torch.no_grad():
+            # Run the encoder once; whisper.decode accepts the encoded features
+            audio_features = self.model.embed_audio(mel)
+            no_speech_probs = self._no_speech_probs(audio_features).tolist()
+        
+        results = [self._empty_result(no_speech_prob=p) for p in no_speech_probs]
+        threshold = self.settings.get("whisper", "no_speech_threshold", 0.6)
+        keep = [i for i, p in enumerate(no_speech_probs) if not (early_exit and p > threshold)]
+        for i in keep:
+            results[i]["skipped"] = False
+        
+        if keep:
+            options = whisper.DecodingOptions(
+                language=self.settings.get("whisper", "language", "en"),
+                without_timestamps=True,
+                sample_len=sample_len,
+                fp16=fp16
+            )
+            if len(keep) < len(results):
+                audio_features = audio_features[keep]
+            decoded = whisper.decode(self.model, audio_features, options)
+            for i, result in zip(keep, decoded):
+                results[i].update(
+                    text=result.text.strip(),
+                    avg_logprob=result.avg_logprob,
+                    compression_ratio=result.compression_ratio
+                )
+        
+        return results
+    
+    def transcribe_detailed(self, audio):
+        """Transcribe one float32 clip and return its result dict with metadata"""
+        return self.transcribe_batch([audio])[0]
+    
+    def is_confident(self, result):
+        """
+        Return True if a result looks like real speech rather than noise or a
+        hallucination, using the same thresholds as Whisper's transcribe
+        
+        Silence is caught by the no-speech check in transcribe_batch; here low
+        average log-probability and repetitive, highly compressible text are
+        rejected.
+        """
+        if result["skipped"] or not result["text"]:
+            return False
+        
+        logprob_threshold = self.settings.get("whisper", "logprob_threshold", -1.0)
+        compression_ratio_threshold = self.settings.get("whisper", "compression_ratio_threshold", 2.4)
+        
+        if result["avg_logprob"] < logprob_threshold:
+            return False
+        if result["compression_ratio"] > compression_ratio_threshold:
+            # Highly compressible text is usually a repetition loop
+            return False
+        return True
+    
+    def _no_speech_probs(self, audio_features):
+        """Probability of the no-speech token after the start-of-transcript token"""
+        tokenizer = whisper.tokenizer.get_tokenizer(
+            self.model.is_multilingual, num_languages=self.model.num_languages)
+        tokens = torch.tensor([[tokenizer.sot]] * audio_features.shape[0], device=audio_features.device)
+        logits = self.model.logits(tokens, audio_features)
+        probs = logits[:, 0].float().softmax(dim=-1)
+        return probs[:, tokenizer.no_speech].cpu()
+    
+    def _empty_result(self, no_speech_prob=None):
+        return {
+            "text": "",
+            "no_speech_prob": no_speech_prob,
+            "avg_logprob": None,
+            "compression_ratio": None,
+            "skipped": True
+        }
+    
+    def use_model(self, model_name):
+        """
+        Switch to another model for this process without saving it to settings
+        
+        Returns:
+        bool: False if the model could not be loaded and tiny is used instead
+        """
+        self.model_name = model_name
+        return self._load_model()
+    
     def set_model(self, model_name):
         """Change the Whisper model and save to settings"""
         if model_name in ["tiny", "base", "small", "medium", "large"]:
             self.settings.set("whisper", "model", model_name)
+            self.model_name = model_name
             self._load_model()
             return True
         return False